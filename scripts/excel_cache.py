@@ -0,0 +1,83 @@
+"""
+Lectura del Excel con la lista de tablas de Extremadura en Datos.
+
+Tanto `update_data.py` como `make_cards.py` necesitan las mismas columnas del
+fichero `Datos Extremadura Mensual.xlsx`.  Este módulo lo lee con el motor
+`calamine` (mucho más rápido que `openpyxl`) y guarda el resultado en un
+fichero pickle junto al Excel (`<excel>.cache.pkl`).  Mientras el Excel no
+cambie (misma fecha de modificación y tamaño) las siguientes ejecuciones
+reutilizan esa copia sin volver a parsear el libro.
+
+Requiere `pandas>=2.2` y `python-calamine`; si este último no está instalado
+se usa `openpyxl`.
+"""
+
+from __future__ import annotations
+
+import pickle
+import re
+from pathlib import Path
+from typing import Tuple, Union
+
+import pandas as pd
+
+
+# Columnas del Excel que utilizan los scripts
+EXCEL_COLUMNS = ["URL", "Métricas", "Periodicidad", "Categoría"]
+
+# Parámetro `t` de las URL de INEbase (identificador de tabla)
+TABLE_ID_RE = re.compile(r"[?&]t=(\d+)")
+
+
+def _cache_key(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_excel_cached(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Lee el Excel de tablas reutilizando una copia en caché si sigue vigente.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Ruta al fichero Excel.  La cabecera está en la tercera fila.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame con las columnas de `EXCEL_COLUMNS` como texto.
+    """
+    path = Path(path)
+    cache_path = path.with_name(path.name + ".cache.pkl")
+    key = _cache_key(path)
+    if cache_path.exists():
+        try:
+            with cache_path.open("rb") as fh:
+                cached_key, df = pickle.load(fh)
+            if cached_key == key:
+                return df
+        except Exception as exc:
+            print(f"[WARN] Caché del Excel no válida ({cache_path.name}): {exc}")
+
+    # Solo las columnas necesarias y como texto: se evita leer y deducir el
+    # tipo del resto de celdas del libro
+    read_kwargs = dict(
+        header=2,
+        usecols=EXCEL_COLUMNS,
+        dtype={col: "string" for col in EXCEL_COLUMNS},
+    )
+    try:
+        df = pd.read_excel(path, engine="calamine", **read_kwargs)
+    except ImportError:
+        # Sin python-calamine se recurre a openpyxl (más lento)
+        df = pd.read_excel(path, engine="openpyxl", **read_kwargs)
+    # Escritura atómica para no dejar una caché a medias
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with tmp_path.open("wb") as fh:
+            pickle.dump((key, df), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except OSError as exc:
+        print(f"[WARN] No se pudo guardar la caché del Excel: {exc}")
+    return df
@@ -20,22 +20,28 @@ La API admite distintos parámetros:
   `VALORES_GRUPOSTABLA`【287621410694593†L86-L93】.
 
 Este módulo implementa una función `get_table_data` que encapsula las
-peticiones HTTP y devuelve la respuesta en formato JSON.  También se
-incluye una función `json_to_dataframe` que convierte el JSON en un
-`pandas.DataFrame` y realiza algunas transformaciones útiles (renombrado
-de columnas, conversión de fechas, etc.).
+peticiones HTTP y devuelve la respuesta en formato JSON, así como su
+variante asíncrona `get_table_data_async` para descargar varias tablas de
+forma concurrente.  También se incluye una función `json_to_dataframe` que
+convierte el JSON en un `pandas.DataFrame` y realiza algunas
+transformaciones útiles (renombrado de columnas, conversión de fechas,
+etc.).
 """
 
 from __future__ import annotations
 
+import functools
 import json
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
+import aiohttp
 import pandas as pd
 import requests
 from dateutil import parser as date_parser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 BASE_URL = "https://servicios.ine.es/wstempus/js"
@@ -46,6 +52,41 @@ class INEAPIError(Exception):
     pass
 
 
+def build_session() -> requests.Session:
+    """
+    Crea una `requests.Session` con un pool de conexiones y reintentos.
+
+    Reutilizar la sesión evita abrir una conexión TCP+TLS nueva por cada
+    petición al INE.  Los errores transitorios (429 y 5xx) se reintentan
+    automáticamente con espera exponencial.
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+    session.mount("https://", adapter)
+    session.headers.update(
+        {
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "extremadura-en-datos/1.0",
+        }
+    )
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """
+    Devuelve la sesión compartida por las llamadas síncronas.
+
+    Se crea en la primera petición y no al importar el módulo.
+    """
+    return build_session()
+
+
 def get_table_data(
     table_id: str,
     language: str = "ES",
@@ -90,29 +131,10 @@ def get_table_data(
         Si la respuesta del servidor no es satisfactoria.
     """
     endpoint = f"{BASE_URL}/{language}/DATOS_TABLA/{table_id}"
-    params = {}
-    if nult is not None:
-        params["nult"] = nult
-    if tip:
-        params["tip"] = tip
-    # La API requiere un parámetro tv por cada filtro, por lo que generamos
-    # una lista de tuplas en lugar de un único valor separado por comas.
-    tv_params = []
-    if tv:
-        for value in tv:
-            tv_params.append(("tv", value))
-
     try:
-        # Construimos una lista de parámetros [(clave, valor)] para que
-        # requests incluya parámetros repetidos (varios 'tv').
-        all_params: List[tuple] = []
-        for key, val in params.items():
-            all_params.append((key, val))
-        for tv_param in tv_params:
-            all_params.append(tv_param)
-        response = requests.get(
+        response = get_session().get(
             endpoint,
-            params=all_params,
+            params=_build_params(nult, tip, tv),
             timeout=timeout,
         )
     except Exception as exc:
@@ -130,6 +152,80 @@ def get_table_data(
     return data
 
 
+async def get_table_data_async(
+    session: aiohttp.ClientSession,
+    table_id: str,
+    language: str = "ES",
+    nult: Optional[int] = None,
+    tip: Optional[str] = None,
+    tv: Optional[List[str]] = None,
+    timeout: int = 30,
+) -> List[Dict[str, Any]]:
+    """
+    Versión asíncrona de `get_table_data` basada en `aiohttp`.
+
+    Permite lanzar la descarga de varias tablas de forma concurrente
+    reutilizando una única `aiohttp.ClientSession`.  Los parámetros y el
+    valor devuelto son los mismos que en `get_table_data`.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Sesión HTTP compartida entre todas las descargas.
+
+    Raises
+    ------
+    INEAPIError
+        Si la respuesta del servidor no es satisfactoria.
+    """
+    endpoint = f"{BASE_URL}/{language}/DATOS_TABLA/{table_id}"
+    try:
+        async with session.get(
+            endpoint,
+            params=_build_params(nult, tip, tv),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise INEAPIError(
+                    f"Respuesta no satisfactoria: {response.status} {text[:200]}"
+                )
+            try:
+                # El INE no siempre declara application/json en la cabecera
+                return await response.json(content_type=None)
+            except json.JSONDecodeError as exc:
+                raise INEAPIError(
+                    f"No se pudo decodificar la respuesta JSON: {exc}"
+                ) from exc
+    except INEAPIError:
+        raise
+    except Exception as exc:
+        raise INEAPIError(f"Error al realizar la solicitud: {exc}") from exc
+
+
+def _build_params(
+    nult: Optional[int] = None,
+    tip: Optional[str] = None,
+    tv: Optional[List[str]] = None,
+) -> List[Tuple[str, Any]]:
+    """
+    Construye la lista de parámetros [(clave, valor)] de una petición.
+
+    La API requiere un parámetro `tv` por cada filtro, por lo que se usa una
+    lista de tuplas en lugar de un diccionario para que el cliente HTTP
+    incluya parámetros repetidos.
+    """
+    params: List[Tuple[str, Any]] = []
+    if nult is not None:
+        params.append(("nult", nult))
+    if tip:
+        params.append(("tip", tip))
+    if tv:
+        for value in tv:
+            params.append(("tv", value))
+    return params
+
+
 def json_to_dataframe(data: List[Dict[str, Any]]) -> pd.DataFrame:
     """
     Convierte la respuesta JSON del INE en un DataFrame de pandas.
@@ -142,10 +238,10 @@ def json_to_dataframe(data: List[Dict[str, Any]]) -> pd.DataFrame:
     * `METADATA`: información sobre las variables y valores empleados en la
       tabla (no se utiliza directamente en esta función).
 
-    Esta función recorre los registros de `DATA` y extrae:
+    Esta función convierte los registros de `DATA` columna a columna:
 
-    * `Fecha`: se convierte a un objeto `datetime` utilizando `dateutil`.
-    * `Valor`: se fuerza a `float` siempre que sea posible.
+    * `Fecha`: se convierte a un objeto `datetime` a partir del periodo.
+    * `Valor`: se fuerza a `float` siempre que sea posible (`NaN` si no).
     * Otras dimensiones: se dejan como columnas de tipo `object`.
 
     Parameters
@@ -159,37 +255,39 @@ def json_to_dataframe(data: List[Dict[str, Any]]) -> pd.DataFrame:
         DataFrame con una fila por observación y columnas para cada
         dimensión, además de `Valor`.
     """
-    records = []
-    for obs in data:
-        # Cada registro contiene claves para las dimensiones (por ejemplo
-        # "Comunidad" o "Periodo") y el campo "Valor".
-        record: Dict[str, Any] = {}
-        for k, v in obs.items():
-            # Ignoramos las claves de metadatos
-            if k in {"NombreSerie", "Id"}:
-                continue
-            if k == "Valor":
-                # Algunos valores llegan como cadenas vacías
-                try:
-                    record[k] = float(v)
-                except (TypeError, ValueError):
-                    record[k] = None
-            elif k.lower() in {"fecha", "periodo"}:
-                # Convertimos formatos como 2025M09 a un datetime
-                record["Fecha"] = _parse_period(v)
-            else:
-                record[k] = v
-        records.append(record)
-    df = pd.DataFrame.from_records(records)
-    # Reordenamos columnas para que Fecha quede la primera
-    cols = list(df.columns)
-    if "Fecha" in cols:
-        cols.insert(0, cols.pop(cols.index("Fecha")))
-        df = df[cols]
+    # Construimos el DataFrame de una vez; los valores anidados (p. ej. la
+    # lista `Data` de cada serie) se conservan tal cual, sin copiarlos.
+    df = pd.DataFrame.from_records(data)
+    # Ignoramos las claves de metadatos
+    df = df.drop(columns=["NombreSerie", "Id"], errors="ignore")
+    if "Valor" in df.columns:
+        # Algunos valores llegan como cadenas vacías
+        df["Valor"] = pd.to_numeric(df["Valor"], errors="coerce")
+    period_col = next((c for c in df.columns if c.lower() in {"fecha", "periodo"}), None)
+    if period_col is not None:
+        # Convertimos formatos como 2025M09 a un datetime
+        df = df.rename(columns={period_col: "Fecha"})
+        df["Fecha"] = _parse_periods(df["Fecha"])
+        # Reordenamos columnas para que Fecha quede la primera
+        df = df[["Fecha", *[c for c in df.columns if c != "Fecha"]]]
     return df
 
 
-def _parse_period(value: str) -> datetime:
+def _parse_periods(s: pd.Series) -> pd.Series:
+    """
+    Convierte una serie de identificadores de periodo del INE a `datetime`.
+
+    Los periodos se repiten en todas las combinaciones de dimensiones de una
+    tabla, así que cada valor distinto se interpreta una sola vez con
+    `_parse_period` y el resultado se reparte a todas sus filas.  Los valores
+    que no se pueden interpretar se devuelven como `NaT`.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    parsed = pd.DatetimeIndex([_parse_period(value) for value in uniques])
+    return pd.Series(parsed.take(codes), index=s.index, name=s.name)
+
+
+def _parse_period(value: str) -> Optional[datetime]:
     """
     Convierte el identificador de periodo del INE a un `datetime`.
 
@@ -198,17 +296,17 @@ def _parse_period(value: str) -> datetime:
     formatos y devuelve el primer día del periodo.
     """
     value = str(value)
-    if "M" in value:
-        # Formato mensual, ej. 2025M09
-        year, month = value.split("M")
-        return datetime(int(year), int(month), 1)
-    if "T" in value:
-        # Formato trimestral, ej. 2025T3
-        year, quarter = value.split("T")
-        month = (int(quarter) - 1) * 3 + 1
-        return datetime(int(year), month, 1)
-    # Anual
     try:
+        if "M" in value:
+            # Formato mensual, ej. 2025M09
+            year, month = value.split("M")
+            return datetime(int(year), int(month), 1)
+        if "T" in value:
+            # Formato trimestral, ej. 2025T3
+            year, quarter = value.split("T")
+            month = (int(quarter) - 1) * 3 + 1
+            return datetime(int(year), month, 1)
+        # Anual
         return datetime(int(value), 1, 1)
     except ValueError:
         # Si no se puede interpretar, se devuelve None
@@ -236,13 +334,20 @@ def filter_by_region(df: pd.DataFrame, region_name: str) -> pd.DataFrame:
         especificada.  Si no se encuentra la columna de comunidad, se devuelve
         el DataFrame original.
     """
+    community_col = _community_column(tuple(df.columns))
+    if community_col is None:
+        return df
+    # Sin .copy(): quien llama crea un DataFrame nuevo al fijar el índice
+    return df[df[community_col] == region_name]
+
+
+@functools.lru_cache(maxsize=None)
+def _community_column(columns: Tuple[str, ...]) -> Optional[str]:
+    """Devuelve la columna con la comunidad autónoma de un esquema de tabla."""
     # Buscamos la columna que contiene la comunidad autónoma
     candidates = [
         col
-        for col in df.columns
+        for col in columns
         if "comunidad" in col.lower() or "autónom" in col.lower() or "ccaa" in col.lower()
     ]
-    if not candidates:
-        return df
-    community_col = candidates[0]
-    return df[df[community_col] == region_name].copy()
+    return candidates[0] if candidates else None
@@ -2,22 +2,42 @@
 # Genera tarjetas PNG (cards) con último valor y variación % del periodo anterior.
 # PRIORIDAD: solo "Industria y Empresa"; si no encuentra, usa TODOS los JSON de docs/data.
 
+import functools
+import hashlib
 import json
-import math
 import os
+import pickle
 import re
-import unicodedata
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
 import pandas as pd
 from PIL import Image, ImageDraw, ImageFont
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson es opcional; json también acepta bytes
+    _json_loads = json.loads
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow se leen solo los JSON
+    pq = None
+
+from excel_cache import TABLE_ID_RE, read_excel_cached
+
 EXCEL_PATH = "Datos Extremadura Mensual.xlsx"
 DOCS_DATA  = Path("docs/data")
 CARDS_DIR  = Path("docs/cards")
-CARDS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Categorías de interés, ya normalizadas sin tildes y en minúsculas
+_RE_INDUSTRIA = re.compile(r"\bindustria\b|\bempresa\b")
+
+@functools.lru_cache(maxsize=None)
 def _load_font(size=32):
     try:
         return ImageFont.truetype("DejaVuSans.ttf", size)
@@ -28,77 +48,165 @@ FONT_T = _load_font(42)   # título
 FONT_V = _load_font(68)   # valor
 FONT_S = _load_font(28)   # secundarios
 
+# Geometría y colores fijos de la tarjeta
+_W, _H = 1000, 560
+_MARGIN = 24
+_TEXT_X = _MARGIN + 32
+_BG = (247, 249, 252)
+_CARD_FILL = "white"
+_CARD_OUTLINE = (225, 230, 236)
+_CARD_BOX = (_MARGIN, _MARGIN, _W - _MARGIN, _H - _MARGIN)
+_FOOTER = "Extremadura en Datos · Industria y Empresa"
+# Nivel zlib de los PNG: las tarjetas son casi planas y el deflate por defecto
+# (6) domina el tiempo de guardado; con 1 el tamaño apenas crece
+_PNG_COMPRESS_LEVEL = 1
+# Tarjetas en WebP (con pérdida, calidad 90) en lugar de PNG.  Desactivado por
+# defecto: con el escritor PNG directo el WebP no es más rápido de codificar y
+# cambiaría las URL publicadas de docs/cards/*.png
+USE_WEBP = False
+
+def _build_template():
+    """Fondo, recuadro y pie comunes a todas las tarjetas (se dibujan una sola vez)."""
+    img = Image.new("RGB", (_W, _H), _BG)
+    d = ImageDraw.Draw(img)
+    d.rounded_rectangle(_CARD_BOX, radius=24, fill=_CARD_FILL, outline=_CARD_OUTLINE, width=2)
+    d.text((_TEXT_X, _H - _MARGIN - 36), _FOOTER, font=FONT_S, fill=(100,116,139))
+    return img
+
+_CARD_TEMPLATE = _build_template()
+
+# Formatos de periodo reconocidos
+_RE_YM  = re.compile(r"^(\d{4})\s*[Mm]\s*(\d{1,2})$")   # 2025M09
+_RE_MY  = re.compile(r"^(\d{1,2})[/-](\d{4})$")           # 09/2025
+_RE_Y_M = re.compile(r"^(\d{4})[/-](\d{1,2})$")           # 2025-9
+_RE_YMD = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")       # 2025-09-01
+_RE_YYYY_MM = re.compile(r"^\d{4}-\d{2}$")                # 2025-09 (ya normalizado)
+
 def normalize_period(p):
     if isinstance(p, (pd.Timestamp, datetime)):
         return p.strftime("%Y-%m")
+    # Caso más habitual: ya viene como YYYY-MM
+    if isinstance(p, str) and _RE_YYYY_MM.fullmatch(p):
+        return p
+    # epoch(ms) -> YYYY-MM
+    if isinstance(p, (int, float)) and p > 10_000_000:
+        return datetime.fromtimestamp(float(p) / 1000.0, timezone.utc).strftime("%Y-%m")
     s = str(p).strip()
-    m = re.match(r"^(\d{4})\s*[Mm]\s*(\d{1,2})$", s)
-    if m: return f"{int(m.group(1)):04d}-{int(m.group(2)):02d}"
-    m = re.match(r"^(\d{1,2})[/-](\d{4})$", s)
-    if m: return f"{int(m.group(2)):04d}-{int(m.group(1)):02d}"
-    m = re.match(r"^(\d{4})[/-](\d{1,2})$", s)
-    if m: return f"{int(m.group(1)):04d}-{int(m.group(2)):02d}"
-    m = re.match(r"^(\d{4})-(\d{2})-(\d{2})$", s)
-    if m: return f"{m.group(1)}-{m.group(2)}"
+    n = len(s)
+    # Formas habituales resueltas por posición, sin pasar por el motor de regex
+    if s[:4].isdecimal():
+        if n == 10 and s[4] == "-" and s[7] == "-" and s[5:7].isdecimal() and s[8:].isdecimal():
+            return s[:7]                                    # 2025-09-01
+        if n in (6, 7) and s[4] in "/-Mm" and s[5:].isdecimal():
+            return f"{s[:4]}-{int(s[5:]):02d}"              # 2025-9, 2025/09, 2025M09
+    elif n in (6, 7) and s[n - 5] in "/-" and s[:n - 5].isdecimal() and s[n - 4:].isdecimal():
+        return f"{s[n - 4:]}-{int(s[:n - 5]):02d}"          # 9/2025, 09-2025
+    # Resto de variantes (p. ej. con espacios): patrones compilados.  Los que
+    # empiezan por año solo pueden casar si hay 4 dígitos al inicio
+    if s[:4].isdecimal():
+        m = _RE_YM.match(s)
+        if m: return f"{int(m.group(1)):04d}-{int(m.group(2)):02d}"
+        m = _RE_Y_M.match(s)
+        if m: return f"{int(m.group(1)):04d}-{int(m.group(2)):02d}"
+        m = _RE_YMD.match(s)
+        if m: return f"{m.group(1)}-{m.group(2)}"
+    else:
+        m = _RE_MY.match(s)
+        if m: return f"{int(m.group(2)):04d}-{int(m.group(1)):02d}"
     try:
         dt = pd.to_datetime(s, errors="raise", dayfirst=True)
         return dt.strftime("%Y-%m")
     except Exception:
         return s
 
+# Formato numérico español -> float: quita separador de miles y coma decimal a punto
+_TRANS = str.maketrans({".": "", ",": "."})
+# float -> texto con formato español: intercambia separador de miles y decimal
+_SWAP_SEP = str.maketrans({",": ".", ".": ","})
+
 def to_float(x):
-    if x is None or (isinstance(x, float) and math.isnan(x)):
+    if x is None:
         return None
     if isinstance(x, (int, float)):
-        return float(x)
+        return None if x != x else float(x)
     s = str(x).strip()
     if s == "" or s.lower() in {"nan", "na", "none"}:
         return None
-    s = s.replace(".", "").replace(",", ".")
+    s = s.translate(_TRANS)
     try:
         return float(s)
     except ValueError:
         return None
 
-def pct_change(a, b):
-    if b is None or b == 0 or a is None:
-        return None
-    return (a - b) / b * 100.0
-
 def read_json(table_id):
     """
     Lee docs/data/<id>.json en cualquiera de estos formatos:
     - Lista de registros con period/value o Periodo/Valor o Fecha/Valor
     - Objeto con clave 'Data' (dict)
     - Lista con UN objeto que contiene 'Data' (list[dict])  <-- tu caso
+    Si existe docs/data/<id>.parquet (y pyarrow está instalado) y no es más
+    antiguo que el JSON, se lee ese en su lugar.
     Convierte Fecha epoch(ms) a 'YYYY-MM', limpia y ordena.
+    El resultado se guarda en docs/data/.cache/<id>.pkl y se reutiliza
+    mientras los ficheros de origen no cambien (fecha de modificación y tamaño).
     """
-    f = DOCS_DATA / f"{table_id}.json"
-    if not f.exists():
+    sources = [DOCS_DATA / f"{table_id}.json", DOCS_DATA / f"{table_id}.parquet"]
+    key = tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in sources if p.exists())
+    if not key:
         return None
-
+    cache = DOCS_DATA / ".cache" / f"{table_id}.pkl"
     try:
-        data = json.loads(f.read_text(encoding="utf-8"))
+        with cache.open("rb") as fh:
+            cached_key, records = pickle.load(fh)
+        if cached_key == key:
+            return records
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        print(f"[WARN] JSON inválido en {f.name}: {e}")
-        return None
+        # Caché ilegible o de otro formato: se trata como si no existiera
+        print(f"[WARN] Caché no válida para {table_id}: {e}")
+
+    records = _read_json_uncached(table_id)
+    if records is not None:
+        # Escritura atómica para no dejar una caché a medias
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_name(cache.name + ".tmp")
+            with tmp.open("wb") as fh:
+                pickle.dump((key, records), fh, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(cache)
+        except OSError as e:
+            print(f"[WARN] No se pudo guardar la caché de {table_id}: {e}")
+    return records
+
+def _read_json_uncached(table_id):
+    f = DOCS_DATA / f"{table_id}.json"
+    fp = DOCS_DATA / f"{table_id}.parquet"
+    # Preferimos la copia Parquet (se carga mucho más rápido que el JSON), pero
+    # solo si está al día: uno anterior al JSON sería de una ejecución pasada
+    if pq is not None and fp.exists() and (
+        not f.exists() or fp.stat().st_mtime_ns >= f.stat().st_mtime_ns
+    ):
+        try:
+            data = pq.read_table(fp).to_pylist()
+        except Exception as e:
+            print(f"[WARN] Parquet inválido en {fp.name}: {e}")
+            data = None
+    else:
+        data = None
+
+    if data is None:
+        if not f.exists():
+            return None
+        try:
+            data = _json_loads(f.read_bytes())
+        except Exception as e:
+            print(f"[WARN] JSON inválido en {f.name}: {e}")
+            return None
 
     # Caso A: lista con dicts "planos"
     if isinstance(data, list) and data and isinstance(data[0], dict) and not data[0].get("Data"):
-        out = []
-        for d in data:
-            per = d.get("period") or d.get("Periodo") or d.get("Fecha")
-            val = d.get("value")  or d.get("Valor")
-            # epoch(ms) -> YYYY-MM
-            if isinstance(per, (int, float)) and per > 10_000_000:
-                per = datetime.utcfromtimestamp(float(per)/1000.0).strftime("%Y-%m")
-            else:
-                per = normalize_period(per)
-            val = to_float(val)
-            if per and val is not None:
-                out.append({"period": per, "value": val})
-        out.sort(key=lambda x: x["period"])
-        return out
+        return _normalize_records(data, ("period", "Periodo", "Fecha"), ("value", "Valor"))
 
     # Caso B: dict con 'Data'
     if isinstance(data, dict) and "Data" in data and isinstance(data["Data"], list):
@@ -111,71 +219,108 @@ def read_json(table_id):
         return None
 
     # Normalizar secuencia 'Data'
+    return _normalize_records(seq, ("Fecha", "Periodo", "period"), ("Valor", "value"))
+
+def _first(d, keys):
+    """Primer valor no nulo de `keys` en el registro `d` (como `a or b`, pero sin descartar 0)."""
+    for k in keys:
+        v = d.get(k)
+        if v is not None:
+            return v
+    return None
+
+def _normalize_records(seq, period_keys, value_keys):
     out = []
-    for it in seq:
-        per = it.get("Fecha") or it.get("Periodo") or it.get("period")
-        val = it.get("Valor")  or it.get("value")
-        if isinstance(per, (int, float)) and per > 10_000_000:
-            per = datetime.utcfromtimestamp(float(per)/1000.0).strftime("%Y-%m")
-        else:
-            per = normalize_period(per)
-        val = to_float(val)
-        if per and val is not None:
+    for d in seq:
+        per = _first(d, period_keys)
+        val = to_float(_first(d, value_keys))
+        if per is None or val is None:
+            continue
+        per = normalize_period(per)
+        if per:
             out.append({"period": per, "value": val})
     out.sort(key=lambda x: x["period"])
     return out
 
 
+# Máscaras ya rasterizadas de textos constantes, por (texto, fuente)
+_TEXT_CACHE = {}
+
+def _paste_static_text(img, xy, text, font, fill):
+    """
+    Equivale a ImageDraw.text para textos que no cambian entre tarjetas: la
+    máscara del texto se rasteriza una vez y después solo se pega con `fill`.
+    """
+    mask = _TEXT_CACHE.get((text, font))
+    if mask is None:
+        _, _, right, bottom = font.getbbox(text)
+        mask = Image.new("L", (right, bottom), 0)
+        ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+        _TEXT_CACHE[(text, font)] = mask
+    img.paste(fill, (xy[0], xy[1], xy[0] + mask.width, xy[1] + mask.height), mask)
+
 def draw_card(title, last_period, last_value, delta_pct, outfile):
-    W, H = 1000, 560
-    img = Image.new("RGB", (W, H), (247, 249, 252))
+    img = _CARD_TEMPLATE.copy()
     d = ImageDraw.Draw(img)
-    margin = 24
-    d.rounded_rectangle([margin, margin, W - margin, H - margin],
-                        radius=24, fill="white", outline=(225,230,236), width=2)
-    d.text((margin + 32, margin + 24), title[:70], font=FONT_T, fill=(30,41,59))
+    d.text((_TEXT_X, _MARGIN + 24), title[:70], font=FONT_T, fill=(30,41,59))
 
-    val_text = f"{last_value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    d.text((margin + 32, margin + 120), val_text, font=FONT_V, fill=(9,105,218))
+    val_text = format(last_value, ",.2f").translate(_SWAP_SEP)
+    d.text((_TEXT_X, _MARGIN + 120), val_text, font=FONT_V, fill=(9,105,218))
 
-    d.text((margin + 32, margin + 210), f"Periodo: {last_period}", font=FONT_S, fill=(71,85,105))
+    d.text((_TEXT_X, _MARGIN + 210), f"Periodo: {last_period}", font=FONT_S, fill=(71,85,105))
 
     if delta_pct is not None:
         color = (16,185,129) if delta_pct >= 0 else (239,68,68)
         signo = "▲" if delta_pct >= 0 else "▼"
         delta_text = f"{signo} {delta_pct:.2f}% vs periodo anterior"
+        d.text((_TEXT_X, _MARGIN + 270), delta_text, font=FONT_S, fill=color)
     else:
-        color = (148,163,184)
-        delta_text = "s/d (sin dato anterior)"
-    d.text((margin + 32, margin + 270), delta_text, font=FONT_S, fill=color)
+        _paste_static_text(img, (_TEXT_X, _MARGIN + 270), "s/d (sin dato anterior)", FONT_S, (148,163,184))
+    # El formato lo decide la extensión del fichero (ver USE_WEBP)
+    if Path(outfile).suffix == ".webp":
+        img.save(outfile, "WEBP", quality=90, method=0)
+    else:
+        _write_png_fast(img, outfile)
 
-    d.text((margin + 32, H - margin - 36),
-           "Extremadura en Datos · Industria y Empresa",
-           font=FONT_S, fill=(100,116,139))
-    img.save(outfile, "PNG")
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
 
-def normalize_text(s):
-    s = str(s or "")
-    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    return s.lower().strip()
+def _write_png_fast(img, path):
+    """
+    Escribe un PNG RGB directamente con zlib, sin el codificador de PIL.
+    Cada fila usa filtro 0 (sin filtro), así que no hay heurística de
+    selección de filtro por fila; solo el deflate al nivel _PNG_COMPRESS_LEVEL.
+    """
+    w, h = img.size
+    raw = img.tobytes()
+    stride = w * 3
+    rows = b"".join(b"\x00" + raw[i:i + stride] for i in range(0, len(raw), stride))
+    comp = zlib.compressobj(_PNG_COMPRESS_LEVEL)
+    idat = comp.compress(rows) + comp.flush()
+    ihdr = struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0)   # 8 bits, RGB, sin entrelazado
+    with open(path, "wb") as fh:
+        fh.write(b"\x89PNG\r\n\x1a\n")
+        fh.write(_png_chunk(b"IHDR", ihdr))
+        fh.write(_png_chunk(b"IDAT", idat))
+        fh.write(_png_chunk(b"IEND", b""))
 
 def ids_from_excel(excel_path):
     if not Path(excel_path).exists():
         print(f"[WARN] Excel no encontrado: {excel_path}. Se usará fallback por JSON.")
         return []
-    df = pd.read_excel(excel_path, header=2)
-    def extrae_id(u):
-        if not isinstance(u, str): return ""
-        m = re.search(r"t=(\d+)", u)
-        return m.group(1) if m else ""
-    df["table_id"] = df["URL"].apply(extrae_id)
-    df = df[df["table_id"].astype(bool)]
-
-    # Filtrado robusto por categoría ("industria" en cualquier parte)
-    cat = df["Categoría"].apply(normalize_text)
-    mask = cat.str.contains(r"\bindustria\b|\bempresa\b", regex=True)
+    df = read_excel_cached(excel_path)
+    df["table_id"] = df["URL"].str.extract(TABLE_ID_RE, expand=False)
+
+    # Filtrado robusto por categoría ("industria" en cualquier parte), en una
+    # sola máscara junto con las filas que tienen identificador de tabla
+    cat = (
+        df["Categoría"].fillna("")
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.casefold().str.strip()
+    )
+    mask = df["table_id"].notna() & cat.str.contains(_RE_INDUSTRIA, na=False)
     df_ie = df.loc[mask, ["table_id", "Métricas"]].drop_duplicates()
-    ids = [(str(r["table_id"]), str(r["Métricas"])) for _, r in df_ie.iterrows()]
+    ids = [(str(tid), str(title)) for tid, title in df_ie.itertuples(index=False, name=None)]
     print(f"[INFO] IDs Industria y Empresa encontrados en Excel: {len(ids)}")
     if len(ids) < 1:
         print("[WARN] Excel sin coincidencias. Se usará fallback: todos los JSON presentes en docs/data/")
@@ -188,59 +333,109 @@ def fallback_ids_from_json():
     print(f"[INFO] Fallback por JSON: {len(ids)} ids")
     return ids
 
-def main():
-    ids = ids_from_excel(EXCEL_PATH)
-    if not ids:
-        ids = fallback_ids_from_json()
-
-    generadas = 0
-    for tid, title in ids:
-        data = read_json_records(tid)
+def _latest_values(tids):
+    """
+    Devuelve {table_id: (último periodo, último valor, variación % o None)}.
+    De cada serie se toman solo los dos últimos periodos; se concatenan en un
+    único DataFrame y el cálculo se hace en bloque con groupby.
+    """
+    frames = []
+    for tid in tids:
+        data = read_json(tid)
         if not data:
             print(f"[WARN] No hay datos en docs/data/{tid}.json. Se omite.")
             continue
-        last = data[-1]
-        prev = data[-2] if len(data) >= 2 else None
-        last_val = to_float(last.get("value"))
-        prev_val = to_float(prev.get("value")) if prev else None
-        if last_val is None:
-            print(f"[WARN] Último valor no numérico para {tid}. Se omite.")
-            continue
-        delta = pct_change(last_val, prev_val)
+        # read_json devuelve la serie ya ordenada: basta con los dos últimos
+        frames.append(pd.DataFrame(data[-2:]).assign(table_id=tid))
+    if not frames:
+        return {}
+    big = pd.concat(frames, ignore_index=True)
+    big["prev"] = big.groupby("table_id", sort=False)["value"].shift()
+    last = big.groupby("table_id", sort=False).tail(1).set_index("table_id")
+    valid_prev = last["prev"].notna() & (last["prev"] != 0)
+    last["delta"] = ((last["value"] - last["prev"]) / last["prev"] * 100.0).where(valid_prev)
+    return {
+        tid: (per, float(val), None if pd.isna(d) else float(d))
+        for tid, per, val, d in last[["period", "value", "delta"]].itertuples(name=None)
+    }
 
-        outfile = CARDS_DIR / f"{tid}.png"
-        draw_card(title or f"Tabla {tid}", last.get("period"), last_val, delta, outfile)
-        print(f"[OK] Generada tarjeta {outfile.name}")
-        generadas += 1
+def _generate_one(tid, title, last_period, last_val, delta):
+    """Dibuja la tarjeta de una tabla. Devuelve el nombre del PNG."""
+    title = title or f"Tabla {tid}"
 
-    # Generar index con las tarjetas (si hay)
-    index_path = Path("docs/index.html")
-    if generadas:
-        items = []
-        for f in sorted(CARDS_DIR.glob("*.png")):
-            items.append(f'<div class="card"><img src="./cards/{f.name}" alt="{f.stem}"><div class="t">{f.stem}</div></div>')
-        html = f"""<!doctype html>
+    # Si el contenido de la tarjeta no ha cambiado, no se vuelve a dibujar
+    # USE_WEBP se consulta en cada llamada para poder cambiarlo en tiempo de ejecución
+    outfile = CARDS_DIR / f"{tid}{'.webp' if USE_WEBP else '.png'}"
+    hash_file = CARDS_DIR / f"{tid}.hash"
+    key = hashlib.blake2b(
+        f"{title}|{last_period}|{last_val:.6f}|{delta if delta is not None else 'nan'}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    if outfile.exists() and hash_file.exists() and hash_file.read_text() == key:
+        print(f"[OK] Tarjeta sin cambios {outfile.name}")
+        return outfile.name
+
+    draw_card(title, last_period, last_val, delta, outfile)
+    hash_file.write_text(key)
+    print(f"[OK] Generada tarjeta {outfile.name}")
+    return outfile.name
+
+# Plantilla fija de docs/index.html, ya codificada; solo se codifican las tarjetas
+_HTML_PREFIX = """<!doctype html>
 <html lang="es">
 <head>
 <meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
 <title>Extremadura en Datos · Industria y Empresa</title>
 <style>
-body{{font-family:system-ui,Arial;margin:24px;background:#f7f9fc;color:#111}}
-h1{{margin:0 0 8px 0}} p{{margin:4px 0 16px 0;color:#475569}}
-.grid{{display:grid;grid-template-columns:repeat(auto-fill,minmax(320px,1fr));gap:18px}}
-.card{{background:#fff;border:1px solid #e5e7eb;border-radius:16px;box-shadow:0 1px 3px rgba(0,0,0,.04);overflow:hidden}}
-.card img{{width:100%;display:block}}
-.t{{padding:10px 12px;color:#475569}}
+body{font-family:system-ui,Arial;margin:24px;background:#f7f9fc;color:#111}
+h1{margin:0 0 8px 0} p{margin:4px 0 16px 0;color:#475569}
+.grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(320px,1fr));gap:18px}
+.card{background:#fff;border:1px solid #e5e7eb;border-radius:16px;box-shadow:0 1px 3px rgba(0,0,0,.04);overflow:hidden}
+.card img{width:100%;display:block}
+.t{padding:10px 12px;color:#475569}
 </style>
 </head>
 <body>
 <h1>Industria y Empresa</h1>
 <p>Último valor y variación % vs periodo anterior (tarjetas generadas automáticamente).</p>
 <div class="grid">
-{''.join(items)}
+""".encode("utf-8")
+_HTML_SUFFIX = b"""
 </div>
 </body></html>"""
-        index_path.write_text(html, encoding="utf-8")
+
+def main():
+    CARDS_DIR.mkdir(parents=True, exist_ok=True)
+    ids = ids_from_excel(EXCEL_PATH)
+    if not ids:
+        ids = fallback_ids_from_json()
+
+    # Lectura y cálculo de variaciones en bloque; después se dibuja cada
+    # tarjeta (PIL + PNG) repartiendo el trabajo entre procesos.  Con un solo
+    # núcleo o una sola tarjeta el pool solo añade coste de arranque.
+    # Una tabla puede aparecer con varios títulos: se dibuja una sola vez (dos
+    # procesos no escriben el mismo PNG) y gana el último, como en el bucle original
+    titles = dict(ids)
+    latest = _latest_values(titles)
+    tasks = [(tid, title, *latest[tid]) for tid, title in titles.items() if tid in latest]
+    workers = min(os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_generate_one, *zip(*tasks), chunksize=4))
+    else:
+        results = [_generate_one(*t) for t in tasks]
+    generadas = sum(1 for res in results if res)
+    # Nombres ya conocidos: no hace falta volver a listar docs/cards
+    generated_names = sorted({res for res in results if res})
+
+    # Generar index con las tarjetas (si hay)
+    index_path = Path("docs/index.html")
+    if generadas:
+        items = "".join(
+            f'<div class="card"><img src="./cards/{n}" alt="{Path(n).stem}"><div class="t">{Path(n).stem}</div></div>'
+            for n in generated_names
+        )
+        index_path.write_bytes(_HTML_PREFIX + items.encode("utf-8") + _HTML_SUFFIX)
         print(f"[OK] Index generado con {generadas} tarjetas.")
     else:
         print("[WARN] No se generaron tarjetas.")
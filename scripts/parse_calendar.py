@@ -19,6 +19,8 @@ from typing import List, Optional
 import requests
 from icalendar import Calendar
 
+from ine_api import get_session
+
 
 class CalendarDownloadError(Exception):
     pass
@@ -48,12 +50,19 @@ def download_calendar(url: str, timeout: int = 30) -> Calendar:
         Objeto de calendario parseado.
     """
     try:
-        response = requests.get(url, timeout=timeout)
+        # Descarga en streaming: se acumula en un único buffer y se parsea una vez
+        with get_session().get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            buf = bytearray()
+            for chunk in response.iter_content(65536):
+                buf.extend(chunk)
+    except requests.HTTPError as exc:
+        raise CalendarDownloadError(
+            f"Respuesta no satisfactoria: {exc.response.status_code}"
+        ) from exc
     except Exception as exc:
         raise CalendarDownloadError(f"No se pudo descargar el calendario: {exc}") from exc
-    if response.status_code != 200:
-        raise CalendarDownloadError(f"Respuesta no satisfactoria: {response.status_code}")
-    return Calendar.from_ical(response.content)
+    return Calendar.from_ical(bytes(buf))
 
 
 def extract_events(cal: Calendar) -> List[INEEvent]:
@@ -70,15 +79,17 @@ def extract_events(cal: Calendar) -> List[INEEvent]:
     list of INEEvent
         Lista con los eventos (publicaciones) contenidos en el calendario.
     """
-    events: List[INEEvent] = []
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            title = str(component.get("SUMMARY"))
-            dtstart = component.get("DTSTART").dt
-            if isinstance(dtstart, datetime):
-                date = dtstart
-            else:
-                # Si llega como fecha sin hora
-                date = datetime.combine(dtstart, datetime.min.time())
-            events.append(INEEvent(title=title, date=date))
-    return events
+    titles: List[str] = []
+    dts = []
+    # walk() admite filtrar por nombre de componente
+    for component in cal.walk("VEVENT"):
+        titles.append(str(component.get("SUMMARY")))
+        dts.append(component.get("DTSTART").dt)
+    # Si llega como fecha sin hora se combina con las 00:00
+    return [
+        INEEvent(
+            title=t,
+            date=d if isinstance(d, datetime) else datetime.combine(d, datetime.min.time()),
+        )
+        for t, d in zip(titles, dts)
+    ]
@@ -18,30 +18,50 @@ Uso:
 python scripts/update_data.py --excel Datos\u00a0Extremadura\u00a0Mensual.xlsx --last 12
 ```
 
-Dependencias: pandas, requests, dateutil (véase requirements.txt).
+Las descargas de todas las tablas se lanzan de forma concurrente con
+`aiohttp`, limitando el número de peticiones simultáneas al INE.
+
+Dependencias: pandas, requests, aiohttp, python-calamine, dateutil (véase
+requirements.txt).
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import os
-import re
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import aiohttp
 import pandas as pd
 
-from ine_api import get_table_data, json_to_dataframe, filter_by_region, INEAPIError
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional; sin él no se escribe el Parquet
+    pa = None
+
+from excel_cache import TABLE_ID_RE, read_excel_cached
+from ine_api import (
+    get_table_data,
+    get_table_data_async,
+    json_to_dataframe,
+    filter_by_region,
+    INEAPIError,
+)
 
 
 DEFAULT_REGION = "Extremadura"
+# Número máximo de descargas simultáneas contra el INE (evita respuestas 429)
+MAX_CONCURRENT_DOWNLOADS = 8
 
 
 def extract_table_id(url: str) -> Optional[str]:
     """Extrae el parámetro `t` de una URL de INEbase."""
-    m = re.search(r"[?&]t=(\d+)", url)
+    m = TABLE_ID_RE.search(url)
     if m:
         return m.group(1)
     return None
@@ -80,6 +100,14 @@ def process_table(
     except INEAPIError as exc:
         print(f"[ERROR] No se pudo descargar la tabla {table_id}: {exc}", file=sys.stderr)
         raise
+    return tidy_table(data, region)
+
+
+def tidy_table(data: List[Dict[str, Any]], region: str) -> pd.DataFrame:
+    """
+    Convierte la respuesta JSON de una tabla en un DataFrame filtrado por
+    comunidad autónoma y con `Fecha` como índice (si existe).
+    """
     df = json_to_dataframe(data)
     # Filtrar por comunidad
     df = filter_by_region(df, region)
@@ -89,46 +117,123 @@ def process_table(
     return df
 
 
+async def _fetch_table(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    table_id: str,
+    nult: Optional[int],
+    tip: Optional[str],
+) -> Union[List[Dict[str, Any]], INEAPIError]:
+    """Descarga una tabla respetando el límite de concurrencia.
+
+    Los errores se devuelven en lugar de propagarse para que el fallo de una
+    tabla no cancele el resto de descargas del grupo.
+    """
+    async with semaphore:
+        try:
+            return await get_table_data_async(session, table_id, nult=nult, tip=tip)
+        except INEAPIError as exc:
+            return exc
+
+
+async def _run_all(
+    jobs: List[Tuple[str, Optional[str], Any]],
+    nult: Optional[int] = None,
+) -> List[Union[List[Dict[str, Any]], INEAPIError]]:
+    """Descarga concurrentemente todas las tablas de `jobs` con una única sesión."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=MAX_CONCURRENT_DOWNLOADS)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(_fetch_table(session, semaphore, table_id, nult, tip))
+                for table_id, tip, _ in jobs
+            ]
+    return [task.result() for task in tasks]
+
+
 def save_dataset(df: pd.DataFrame, out_dir: Path, table_id: str) -> None:
-    """Guarda un DataFrame en CSV y JSON en la carpeta indicada."""
+    """Guarda un DataFrame en CSV, JSON y Parquet en la carpeta indicada."""
     out_dir.mkdir(parents=True, exist_ok=True)
     csv_path = out_dir / f"{table_id}.csv"
     json_path = out_dir / f"{table_id}.json"
+    parquet_path = out_dir / f"{table_id}.parquet"
+    flat = df.reset_index()
     df.to_csv(csv_path)
-    df.reset_index().to_json(json_path, orient="records", date_format="iso")
+    _write_parquet(flat, parquet_path)
+    flat.to_json(json_path, orient="records", date_format="iso")
     print(f"[INFO] Guardado {table_id} en {csv_path} y {json_path}")
 
 
+def _write_parquet(flat: pd.DataFrame, parquet_path: Path) -> None:
+    """
+    Escribe una copia Parquet (zstd) con `pyarrow`, si está disponible.
+
+    Es una salida adicional: si falla se avisa, se borra el Parquet que
+    pudiera quedar de una ejecución anterior (quedaría desfasado respecto al
+    JSON) y se siguen escribiendo el CSV y el JSON de la tabla.
+    """
+    if pa is None:
+        return
+    try:
+        table = pa.Table.from_pandas(flat, preserve_index=False)
+        pq.write_table(table, parquet_path, compression="zstd")
+    except (pa.ArrowException, OSError) as exc:
+        print(f"[WARN] No se pudo escribir el Parquet de {parquet_path.stem}: {exc}")
+        try:
+            parquet_path.unlink(missing_ok=True)
+        except OSError as unlink_exc:
+            print(f"[WARN] No se pudo borrar {parquet_path}: {unlink_exc}")
+
+
 def main(args: argparse.Namespace) -> None:
     # Leer el Excel
-    df_excel = pd.read_excel(args.excel, header=2)
+    df_excel = read_excel_cached(args.excel)
     # Crear directorios de salida
     raw_dir = Path(args.output) / "raw"
     processed_dir = Path(args.output) / "processed"
     raw_dir.mkdir(parents=True, exist_ok=True)
     processed_dir.mkdir(parents=True, exist_ok=True)
 
-    for _, row in df_excel.iterrows():
-        url = row.get("URL")
-        if not isinstance(url, str) or not url:
-            continue
-        table_id = extract_table_id(url)
-        if not table_id:
-            print(f"[WARN] No se encontró identificador en {url}")
-            continue
+    # Extraer de una vez el identificador de tabla de todas las URL
+    df_excel = df_excel[df_excel["URL"].fillna("") != ""]
+    df_excel = df_excel.assign(
+        table_id=df_excel["URL"].str.extract(TABLE_ID_RE, expand=False)
+    )
+    for url in df_excel.loc[df_excel["table_id"].isna(), "URL"]:
+        print(f"[WARN] No se encontró identificador en {url}")
+
+    jobs: List[Tuple[str, Optional[str], Any]] = []
+    rows = (
+        df_excel[["table_id", "Métricas", "Periodicidad"]]
+        .dropna(subset=["table_id"])
+        .itertuples(index=False, name=None)
+    )
+    for table_id, metricas, periodicidad in rows:
         if args.dry_run:
-            print(f"[DRY] Tabla {table_id} ({row.get('Métricas')}) se descargaría")
+            print(f"[DRY] Tabla {table_id} ({metricas}) se descargaría")
+            continue
+        # Determinar tip a partir de periodicidad
+        periodicidad = str(periodicidad).strip().lower()
+        tip = None
+        if "mensual" in periodicidad:
+            tip = "M"
+        elif "trimestral" in periodicidad:
+            tip = "T"
+        jobs.append((table_id, tip, metricas))
+
+    if not jobs:
+        return
+
+    # Descargar todas las tablas de forma concurrente
+    results = asyncio.run(_run_all(jobs, nult=args.last))
+
+    for (table_id, _, _), data in zip(jobs, results):
+        if isinstance(data, INEAPIError):
+            print(f"[ERROR] No se pudo descargar la tabla {table_id}: {data}", file=sys.stderr)
             continue
         try:
-            # Determinar tip a partir de periodicidad
-            periodicidad = str(row.get("Periodicidad", "")).strip().lower()
-            tip = None
-            if "mensual" in periodicidad:
-                tip = "M"
-            elif "trimestral" in periodicidad:
-                tip = "T"
-            # Descargar
-            df_table = process_table(table_id, region=DEFAULT_REGION, nult=args.last, tip=tip)
+            df_table = tidy_table(data, DEFAULT_REGION)
             # Guardar datos crudos
             save_dataset(df_table, processed_dir, table_id)
         except Exception as exc: